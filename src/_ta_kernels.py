@@ -0,0 +1,293 @@
+"""
+Technical Analysis Kernels
+
+This module provides compiled single-pass kernels for technical indicator calculation.
+Numba is optional: without it the kernels run as plain Python.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# Columns of the array filled by compute_indicators, in order
+INDICATOR_COLUMNS = (
+    'MA20', 'MA50', 'MA200',
+    'EMA12', 'EMA26',
+    'MACD', 'MACD_Signal', 'MACD_Histogram',
+    'RSI',
+    'BB_Middle', 'BB_Std', 'BB_Upper', 'BB_Lower',
+    'ATR',
+)
+
+
+@njit(cache=True)
+def _ema_step(ema, weight, x, alpha):
+    """
+    Advance an exponential moving average (pandas ewm, adjust=False) by one value.
+
+    The weight of the previous average decays over missing values, as in pandas.
+
+    Returns:
+        tuple: (new average, new weight of the average)
+    """
+    if np.isnan(ema):
+        if np.isnan(x):
+            return ema, weight
+        return x, 1.0
+    weight *= 1.0 - alpha
+    if np.isnan(x):
+        return ema, weight
+    return (weight * ema + alpha * x) / (weight + alpha), 1.0
+
+
+@njit(cache=True)
+def _wilder_step(avg, x, window):
+    """Advance a Wilder-smoothed average by one value."""
+    return (avg * (window - 1) + x) / window
+
+
+@njit(cache=True)
+def _rsi(avg_gain, avg_loss):
+    """
+    Relative Strength Index from average gain and loss.
+
+    A window without losses gives 100, and a window without any price change 50.
+    """
+    if avg_loss > 0:
+        return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    if avg_gain > 0:
+        return 100.0
+    return 50.0
+
+
+@njit(cache=True)
+def compute_indicators(close, high, low, out):
+    """
+    Calculate all technical indicators in a single pass over the price arrays.
+
+    Matches the pandas rolling/ewm definitions: rolling windows need every value
+    in the window to be valid, and EMAs use adjust=False. RSI uses Wilder's
+    smoothing, the standard definition.
+
+    Args:
+        close (numpy.ndarray): Closing prices (float64)
+        high (numpy.ndarray): High prices (float64)
+        low (numpy.ndarray): Low prices (float64)
+        out (numpy.ndarray): Output array of shape (len(close), len(INDICATOR_COLUMNS)),
+                             filled in place
+    """
+    n = close.shape[0]
+    out[:, :] = np.nan
+
+    tr = np.full(n, np.nan)
+
+    # Rolling sums and counts of valid values
+    sum50 = 0.0
+    count50 = 0
+    sum200 = 0.0
+    count200 = 0
+    tr_sum = 0.0
+    tr_count = 0
+
+    # Welford state of the 20-day window (MA20 and BB_Std)
+    count20 = 0
+    mean20 = 0.0
+    m2_20 = 0.0
+
+    ema12 = np.nan
+    ema12_weight = 1.0
+    ema26 = np.nan
+    ema26_weight = 1.0
+    signal = np.nan
+    signal_weight = 1.0
+
+    # Wilder-smoothed average gain and loss of the RSI
+    avg_gain = 0.0
+    avg_loss = 0.0
+
+    for i in range(n):
+        x = close[i]
+
+        # Moving averages and Bollinger Bands
+        if not np.isnan(x):
+            sum50 += x
+            count50 += 1
+            sum200 += x
+            count200 += 1
+            count20 += 1
+            delta = x - mean20
+            mean20 += delta / count20
+            m2_20 += delta * (x - mean20)
+        if i >= 20 and not np.isnan(close[i - 20]):
+            old = close[i - 20]
+            count20 -= 1
+            if count20 == 0:
+                mean20 = 0.0
+                m2_20 = 0.0
+            else:
+                delta = old - mean20
+                mean20 -= delta / count20
+                m2_20 -= delta * (old - mean20)
+        if i >= 50 and not np.isnan(close[i - 50]):
+            sum50 -= close[i - 50]
+            count50 -= 1
+        if i >= 200 and not np.isnan(close[i - 200]):
+            sum200 -= close[i - 200]
+            count200 -= 1
+
+        if count20 == 20:
+            out[i, 0] = mean20
+            out[i, 10] = np.sqrt(max(m2_20, 0.0) / 19.0)
+        if count50 == 50:
+            out[i, 1] = sum50 / 50.0
+        if count200 == 200:
+            out[i, 2] = sum200 / 200.0
+
+        # Exponential moving averages and MACD
+        ema12, ema12_weight = _ema_step(ema12, ema12_weight, x, 2.0 / 13.0)
+        ema26, ema26_weight = _ema_step(ema26, ema26_weight, x, 2.0 / 27.0)
+        macd = ema12 - ema26
+        signal, signal_weight = _ema_step(signal, signal_weight, macd, 2.0 / 10.0)
+        out[i, 3] = ema12
+        out[i, 4] = ema26
+        out[i, 5] = macd
+        out[i, 6] = signal
+        out[i, 7] = macd - signal
+
+        # RSI (Wilder's smoothing over 14 days, seeded with the simple average
+        # of the first 14 changes)
+        if i > 0:
+            change = x - close[i - 1]
+            gain = change if change > 0 else 0.0
+            loss = -change if change < 0 else 0.0
+            if i <= 14:
+                avg_gain += gain / 14.0
+                avg_loss += loss / 14.0
+            else:
+                avg_gain = _wilder_step(avg_gain, gain, 14)
+                avg_loss = _wilder_step(avg_loss, loss, 14)
+            if i >= 14:
+                out[i, 8] = _rsi(avg_gain, avg_loss)
+
+        # Average True Range. The True Range only lives in a scratch buffer, for
+        # dropping values as they leave the window.
+        range_hl = abs(high[i] - low[i])
+        if i > 0:
+            prev_close = close[i - 1]
+            for candidate in (range_hl, abs(high[i] - prev_close), abs(low[i] - prev_close)):
+                if not np.isnan(candidate) and (np.isnan(tr[i]) or candidate > tr[i]):
+                    tr[i] = candidate
+        else:
+            tr[i] = range_hl
+        if not np.isnan(tr[i]):
+            tr_sum += tr[i]
+            tr_count += 1
+        if i >= 14 and not np.isnan(tr[i - 14]):
+            tr_sum -= tr[i - 14]
+            tr_count -= 1
+        if tr_count == 14:
+            out[i, 13] = tr_sum / 14.0
+
+    # Bollinger Bands share the 20-day window of MA20
+    out[:, 9] = out[:, 0]
+    out[:, 11] = out[:, 0] + 2.0 * out[:, 10]
+    out[:, 12] = out[:, 0] - 2.0 * out[:, 10]
+
+
+@njit(cache=True)
+def dual_moving_average(close, short_window, long_window):
+    """
+    Calculate two simple moving averages of the same prices in a single pass.
+
+    As with pandas rolling().mean(), a value needs every price in its window to be valid.
+
+    Args:
+        close (numpy.ndarray): Closing prices (float64)
+        short_window (int): Window of the first moving average
+        long_window (int): Window of the second moving average
+
+    Returns:
+        tuple: (short moving average, long moving average) arrays
+    """
+    n = close.shape[0]
+    short_ma = np.full(n, np.nan)
+    long_ma = np.full(n, np.nan)
+
+    short_sum = 0.0
+    short_count = 0
+    long_sum = 0.0
+    long_count = 0
+
+    for i in range(n):
+        x = close[i]
+        if not np.isnan(x):
+            short_sum += x
+            short_count += 1
+            long_sum += x
+            long_count += 1
+        if i >= short_window and not np.isnan(close[i - short_window]):
+            short_sum -= close[i - short_window]
+            short_count -= 1
+        if i >= long_window and not np.isnan(close[i - long_window]):
+            long_sum -= close[i - long_window]
+            long_count -= 1
+
+        if short_count == short_window:
+            short_ma[i] = short_sum / short_window
+        if long_count == long_window:
+            long_ma[i] = long_sum / long_window
+
+    return short_ma, long_ma
+
+
+@njit(cache=True)
+def m4_indices(y, n_bins):
+    """
+    Select the points of a line that remain visible when it is drawn n_bins pixels wide (M4).
+
+    Each of n_bins equal slices of the series keeps its first, last, lowest and highest
+    point. Missing values are skipped when looking for the lowest and highest point.
+
+    Args:
+        y (numpy.ndarray): Line values (float64)
+        n_bins (int): Number of slices, usually the chart width in pixels
+
+    Returns:
+        numpy.ndarray: Sorted positions of the selected points
+    """
+    n = y.shape[0]
+    keep = np.zeros(n, dtype=np.bool_)
+
+    for b in range(n_bins):
+        start = b * n // n_bins
+        end = (b + 1) * n // n_bins
+        if start == end:
+            continue
+        keep[start] = True
+        keep[end - 1] = True
+
+        low = -1
+        high = -1
+        for i in range(start, end):
+            if np.isnan(y[i]):
+                continue
+            if low < 0 or y[i] < y[low]:
+                low = i
+            if high < 0 or y[i] > y[high]:
+                high = i
+        if low >= 0:
+            keep[low] = True
+            keep[high] = True
+
+    return np.nonzero(keep)[0]
@@ -4,40 +4,259 @@ AI Analysis Module
 This module provides functions for analyzing stock data using AI tools (OpenAI).
 """
 
+import asyncio
+import hashlib
+import importlib.util
 import os
+import re
+import time
+from collections import OrderedDict
 from datetime import datetime
+import httpx
+import numpy as np
 import openai
 from dotenv import load_dotenv
 
 
+# Connection pool of the HTTP client shared by all OpenAI calls. Tune
+# HTTP_MAX_CONNECTIONS to the rate limits of the OpenAI account.
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 50
+
+# HTTP/2 lets concurrent calls share one connection, but needs the optional
+# h2 package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Time-to-live (seconds) of cached LLM responses
+NEWS_CACHE_TTL = 6 * 60 * 60
+REPORT_CACHE_TTL = 24 * 60 * 60
+
+# Maximum number of cached LLM responses; the least recently used are dropped first
+RESPONSE_CACHE_MAX_ENTRIES = 256
+
+# Streamed reports coalesce tokens into messages whose size grows by this
+# factor, up to the maximum, after each message
+STREAM_BATCH_GROWTH_FACTOR = 2
+STREAM_MAX_BATCH_SIZE = 16
+
+# Static instructions are kept separate from the per-call data and sent first,
+# byte-for-byte identical on every call, so they hit OpenAI's prompt cache
+NEWS_SYSTEM_PROMPT = """\
+Provide a comprehensive summary of the most significant recent news about the company given by the user
+that could impact its stock price and fundamental value. The user will provide you also with the price trend of the company.
+
+Focus on:
+
+1. Recent earnings reports and financial performance.
+2. Reasoning behind the price development of the stock in the past.
+3. Major business developments (new products, services, markets)
+4. Future innovations, partnerships, or acquisitions.
+5. Leadership changes or organizational restructuring
+6. Regulatory developments affecting the company
+7. Macroeconomic factors influencing the company and its industry
+8. Geopolitical events that might impact operations or supply chains
+9. Competitive landscape changes
+
+You should do a detailed internet search for each of the points above before reaching a conclusion.
+
+Think in steps.
+
+Format your response as a well-structured analysis with clear sections and bullet points where appropriate.
+Include dates of key events where possible. Highlight the potential impact of each development on the company's future performance.
+"""
+
+REPORT_SYSTEM_PROMPT = """\
+You are a senior financial analyst with extensive experience in equity research and investment analysis.
+
+The user will provide company information, financial ratios, technical indicators and a news analysis for a stock.
+Based on all this information, provide a comprehensive investment analysis report with the following sections:
+
+1. Executive Summary - A brief overview of the company and its current situation
+2. Fundamental Analysis - Analysis of financial health, valuation, and growth prospects
+3. Technical Analysis - Interpretation of price movements and technical indicators
+4. News Impact Analysis - How recent news affects the company's prospects
+5. Risk Assessment - Key risks facing the company
+6. Investment Outlook - Overall assessment including strengths, weaknesses, opportunities, and threats
+7. Recommendation - Clear investment recommendation (Buy/Hold/Sell) with reasoning
+
+The report should be well-structured with clear sections and bullet points where appropriate.
+Focus on providing actionable insights based on the data provided.
+"""
+
+# Separates the news analysis from the investment report in the output of
+# the combined news-and-report call
+NEWS_END_MARKER = "<<<END_NEWS>>>"
+
+NEWS_AND_REPORT_SYSTEM_PROMPT = f"""\
+Write the two sections below, in order, for the company described by the user.
+
+### SECTION 1: NEWS ANALYSIS
+
+{NEWS_SYSTEM_PROMPT}
+When the news analysis is complete, write {NEWS_END_MARKER} on a line of its own.
+
+### SECTION 2: INVESTMENT REPORT
+
+{REPORT_SYSTEM_PROMPT}
+Use your news analysis from section 1 as the news analysis for this report.
+"""
+
+# Matches the date line of a prompt, stripped before hashing so that
+# date-only changes still hit the cache
+_TODAY_RE = re.compile(r"Today is [^.]*\.\s*")
+
+
+def _round_value(value, decimals=4):
+    """
+    Round floats for compact prompt text, leaving other values untouched.
+    
+    Args:
+        value: Value to format
+        decimals (int): Number of decimals to keep
+        
+    Returns:
+        Rounded float, or the original value
+    """
+    if isinstance(value, float):
+        return round(value, decimals)
+    return value
+
+
+def _to_compact_csv(df, decimals=4):
+    """
+    Serialize a DataFrame as CSV with rounded floats.
+    
+    CSV avoids the column padding of DataFrame.to_string(), which takes
+    several times more prompt tokens for the same information.
+    
+    Args:
+        df (pandas.DataFrame): DataFrame to serialize
+        decimals (int): Number of decimals to keep
+        
+    Returns:
+        str: CSV text
+    """
+    return df.round(decimals).to_csv()
+
+
 class AIAnalysis:
     """Class for AI-powered stock analysis."""
     
-    def __init__(self, api_key=None, model="gpt-4o-mini"):
+    # Process-wide LRU cache of LLM responses: key -> (expires_at, text)
+    _response_cache = OrderedDict()
+    
+    # Whether the .env file has already been loaded into the environment
+    _dotenv_loaded = False
+    
+    def __init__(self, api_key=None, model="gpt-4o-mini", news_model="gpt-4o-mini",
+                 news_max_tokens=800, report_max_tokens=1800):
         """
         Initialize with OpenAI API key.
         
         Args:
             api_key (str, optional): OpenAI API key. If None, looks for 
                                     OPENAI_API_KEY in environment variables.
+            model (str): Model used for reports and comparisons
+            news_model (str): Model used for the news analysis. Should be a cheap
+                              model with web search support, since the step is
+                              mostly news extraction.
+            news_max_tokens (int): Output token limit for the news analysis
+            report_max_tokens (int): Output token limit for the comprehensive report
         """
-        # Load environment variables if no API key provided
+        # Load environment variables (once per process) if no API key provided
         if api_key is None:
-            load_dotenv()
+            if not AIAnalysis._dotenv_loaded:
+                load_dotenv()
+                AIAnalysis._dotenv_loaded = True
             api_key = os.getenv("OPENAI_API_KEY")
         
         self.api_key = api_key
         self.client = None
         self.default_model = model
+        self.news_model = news_model
+        self.news_max_tokens = news_max_tokens
+        self.report_max_tokens = report_max_tokens
+        self._http = None
         
         if self.api_key:
             try:
-                self.client = openai.OpenAI(api_key=api_key)
+                self._http = httpx.AsyncClient(
+                    http2=HTTP2_AVAILABLE,
+                    limits=httpx.Limits(
+                        max_connections=HTTP_MAX_CONNECTIONS,
+                        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS
+                    ),
+                    timeout=httpx.Timeout(60.0, connect=5.0)
+                )
+                self.client = openai.AsyncOpenAI(api_key=api_key, http_client=self._http)
                 print("OpenAI client initialized successfully.")
             except Exception as e:
                 print(f"Error initializing OpenAI client: {e}")
     
-    def get_news_analysis(self, company_name, stock_symbol, price_trends=None):
+    async def aclose(self):
+        """Close the OpenAI client and its HTTP connection pool."""
+        if self.client is not None:
+            await self.client.close()
+        if self._http is not None:
+            await self._http.aclose()
+    
+    def _cache_key(self, model, prompt):
+        """
+        Build the cache key for a prompt.
+        
+        Args:
+            model (str): Model the prompt is sent to
+            prompt (str): Prompt text
+            
+        Returns:
+            str: SHA-256 hex digest of the model and the date-normalized prompt
+        """
+        normalized = _TODAY_RE.sub("", prompt)
+        return hashlib.sha256(f"{model}\n{normalized}".encode("utf-8")).hexdigest()
+    
+    def _cache_get(self, key):
+        """
+        Look up a cached response.
+        
+        Args:
+            key (str): Cache key
+            
+        Returns:
+            str: Cached response text, or None on a miss or an expired entry
+        """
+        entry = self._response_cache.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, text = entry
+        if expires_at < time.monotonic():
+            self._response_cache.pop(key, None)
+            return None
+        self._response_cache.move_to_end(key)
+        return text
+    
+    def _cache_set(self, key, text, ttl):
+        """
+        Store a response in the cache.
+        
+        Args:
+            key (str): Cache key
+            text (str): Response text
+            ttl (int): Time-to-live in seconds
+        """
+        now = time.monotonic()
+        cache = self._response_cache
+        
+        # Sweep out expired entries, whose keys are usually never read again
+        for expired_key in [k for k, (expires_at, _) in cache.items() if expires_at < now]:
+            del cache[expired_key]
+        
+        cache[key] = (now + ttl, text)
+        cache.move_to_end(key)
+        while len(cache) > RESPONSE_CACHE_MAX_ENTRIES:
+            cache.popitem(last=False)
+    
+    async def get_news_analysis(self, company_name, stock_symbol, price_trends=None):
         """
         Get news analysis from OpenAI.
         
@@ -55,42 +274,161 @@ class AIAnalysis:
         try:
             # Current date for context
             today = datetime.now().strftime("%d %B %Y")
-            prompt = f"""
-                    Today is {today}. Provide a comprehensive summary of the most significant recent news about {company_name} ({stock_symbol}) 
-                    that could impact its stock price and fundamental value. The user will provide you also with the price trend of the company. 
-                    
-                    Focus on:
-                    
-                    1. Recent earnings reports and financial performance.
-                    2. Reasoning behind the price development of the stock in the past.  
-                    2. Major business developments (new products, services, markets)
-                    3. Future innovations, partnerships, or acquisitions. 
-                    4. Leadership changes or organizational restructuring
-                    5. Regulatory developments affecting the company
-                    6. Macroeconomic factors influencing the company and its industry
-                    7. Geopolitical events that might impact operations or supply chains
-                    8. Competitive landscape changes
-
-                    You should do a detailed internet search for each of the points above before reaching a conclusion.
-
-                    Think in steps.
-                    
-                    Format your response as a well-structured analysis with clear sections and bullet points where appropriate.
-                    Include dates of key events where possible. Highlight the potential impact of each development on the company's future performance.
-
-                    {price_trends}
-                    """
+            prompt = (
+                f"Company: {company_name} ({stock_symbol})\n\n"
+                f"PRICE TRENDS:\n{price_trends}\n\n"
+                f"Today is {today}."
+            )
+            
+            cache_key = self._cache_key(self.news_model, NEWS_SYSTEM_PROMPT + prompt)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
                 
-            response = self.client.responses.create(
-                model=self.default_model,
+            response = await self.client.responses.create(
+                model=self.news_model,
                 tools=[{ "type": "web_search_preview" }],
+                instructions=NEWS_SYSTEM_PROMPT,
                 input=prompt,
+                max_output_tokens=self.news_max_tokens,
             )
-            return response.output[1].content[0].text
+            news_analysis = response.output[1].content[0].text
+            self._cache_set(cache_key, news_analysis, NEWS_CACHE_TTL)
+            return news_analysis
         except Exception as e:
             return f"Error fetching news analysis: {e}"
     
-    def generate_comprehensive_report(self, stock_symbol, stock_info, financial_ratios, 
+    async def get_news_analyses(self, companies):
+        """
+        Get news analyses for several companies concurrently.
+        
+        Args:
+            companies (list): List of (company_name, stock_symbol, price_trends) tuples
+            
+        Returns:
+            list: News analysis texts, in the same order as companies
+        """
+        return await asyncio.gather(*(
+            self.get_news_analysis(company_name, stock_symbol, price_trends)
+            for company_name, stock_symbol, price_trends in companies
+        ))
+    
+    def _build_report_prompt(self, stock_symbol, stock_info, financial_ratios,
+                             tech_indicators, news_analysis, price_trends=None):
+        """
+        Build the user prompt for the comprehensive report.
+        
+        The prompt only carries the per-call data, with the date last; the
+        instructions are sent separately as REPORT_SYSTEM_PROMPT.
+        
+        Args:
+            stock_symbol (str): Stock symbol
+            stock_info (dict): Stock information dictionary
+            financial_ratios (dict): Financial ratios dictionary
+            tech_indicators (dict): Technical indicators dictionary
+            news_analysis (str): News analysis text, or None to leave the section out
+            price_trends (str, optional): Price trends text
+            
+        Returns:
+            str: Report prompt
+        """
+        # Prepare financial ratios string
+        ratios_str = "\n".join([f"{ratio}: {_round_value(value)}" for ratio, value in financial_ratios.items()])
+        
+        # Prepare technical indicators string
+        if tech_indicators:
+            tech_str = "\n".join([f"{indicator}: {_round_value(value)}" for indicator, value in tech_indicators.items()])
+        else:
+            tech_str = "Not provided"
+        
+        # Prepare info summary
+        info_summary = "\n".join([
+            f"Company: {stock_info.get('company_name', stock_symbol)}",
+            f"Symbol: {stock_symbol}",
+            f"Sector: {stock_info.get('sector', 'N/A')}",
+            f"Industry: {stock_info.get('industry', 'N/A')}",
+            f"Current Price: ${stock_info.get('current_price', 'N/A')}",
+            f"52-Week Range: ${stock_info.get('fiftyTwoWeekLow', 'N/A')} - ${stock_info.get('fiftyTwoWeekHigh', 'N/A')}",
+            f"Market Cap: ${stock_info.get('marketCap', 'N/A')}",
+            f"Beta: {stock_info.get('beta', 'N/A')}",
+            f"Price Trends: {price_trends}",
+        ])
+        
+        # Current date for context
+        today = datetime.now().strftime("%Y-%m-%d")
+        
+        # Variable data only; the instructions live in REPORT_SYSTEM_PROMPT
+        sections = [
+            f"COMPANY INFORMATION:\n{info_summary}",
+            f"FINANCIAL RATIOS:\n{ratios_str}",
+            f"TECHNICAL INDICATORS (Most Recent):\n{tech_str}",
+        ]
+        if news_analysis is not None:
+            sections.append(f"NEWS ANALYSIS:\n{news_analysis}")
+        sections.append(f"Today is {today}.")
+        prompt = "\n\n".join(sections)
+        
+        return prompt
+    
+    async def news_and_report(self, company_name, stock_symbol, stock_info, financial_ratios,
+                              tech_indicators, price_trends=None):
+        """
+        Get the news analysis and the comprehensive report with a single LLM call.
+        
+        Equivalent to get_news_analysis followed by generate_comprehensive_report,
+        but the model writes both in one response, saving a round trip and
+        sending the shared context only once.
+        
+        Args:
+            company_name (str): Company name
+            stock_symbol (str): Stock symbol
+            stock_info (dict): Stock information dictionary
+            financial_ratios (dict): Financial ratios dictionary
+            tech_indicators (dict): Technical indicators dictionary
+            price_trends (str, optional): Price trends text
+            
+        Returns:
+            tuple: (news analysis text, comprehensive analysis report)
+        """
+        if self.client is None:
+            message = "OpenAI client not initialized. Please set up your API key."
+            return message, message
+        
+        try:
+            prompt = (
+                f"Company: {company_name} ({stock_symbol})\n\n"
+                + self._build_report_prompt(stock_symbol, stock_info, financial_ratios,
+                                            tech_indicators, None, price_trends)
+            )
+            
+            cache_key = self._cache_key(self.default_model, NEWS_AND_REPORT_SYSTEM_PROMPT + prompt)
+            output = self._cache_get(cache_key)
+            complete = output is not None
+            if output is None:
+                response = await self.client.responses.create(
+                    model=self.default_model,
+                    tools=[{ "type": "web_search_preview" }],
+                    instructions=NEWS_AND_REPORT_SYSTEM_PROMPT,
+                    input=prompt,
+                    max_output_tokens=self.news_max_tokens + self.report_max_tokens,
+                )
+                output = response.output_text
+                # "incomplete" means the output was cut off, e.g. at the token limit
+                complete = getattr(response, "status", None) != "incomplete"
+            
+            news_analysis, marker, report = output.partition(NEWS_END_MARKER)
+            # Only cache well-formed output, so a bad response is retried next time
+            if complete and marker:
+                self._cache_set(cache_key, output, NEWS_CACHE_TTL)
+            if not marker:
+                # The model skipped the marker; keep the whole text as the report
+                return None, output.strip()
+            return news_analysis.strip(), report.strip()
+        except Exception as e:
+            message = f"Error generating news analysis and report: {e}"
+            return message, message
+    
+    async def generate_comprehensive_report(self, stock_symbol, stock_info, financial_ratios, 
                                     tech_indicators, news_analysis, price_trends=None):
         """
         Generate a comprehensive stock analysis report using OpenAI.
@@ -110,72 +448,110 @@ class AIAnalysis:
             return "OpenAI client not initialized. Please set up your API key."
         
         try:
-            # Prepare financial ratios string
-            ratios_str = "\n".join([f"{ratio}: {value}" for ratio, value in financial_ratios.items()])
-            
-            # Prepare technical indicators string
-            tech_str = "\n".join([f"{indicator}: {value}" for indicator, value in tech_indicators.items()])
-            
-            # Prepare info summary
-            info_summary = f"""
-            Company: {stock_info.get('company_name', stock_symbol)}
-            Symbol: {stock_symbol}
-            Sector: {stock_info.get('sector', 'N/A')}
-            Industry: {stock_info.get('industry', 'N/A')}
-            Current Price: ${stock_info.get('current_price', 'N/A')}
-            52-Week Range: ${stock_info.get('fiftyTwoWeekLow', 'N/A')} - ${stock_info.get('fiftyTwoWeekHigh', 'N/A')}
-            Market Cap: ${stock_info.get('marketCap', 'N/A')}
-            Beta: {stock_info.get('beta', 'N/A')}
-            Price Trends: {price_trends}
-            """
+            prompt = self._build_report_prompt(stock_symbol, stock_info, financial_ratios,
+                                               tech_indicators, news_analysis, price_trends)
             
-            # Current date for context
-            today = datetime.now().strftime("%Y-%m-%d")
+            cache_key = self._cache_key(self.default_model, REPORT_SYSTEM_PROMPT + prompt)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
             
-            prompt = f"""
-            Today is {today}. As a financial analyst, provide a comprehensive investment analysis report for {stock_symbol} based on the following information:
-            
-            COMPANY INFORMATION:
-            {info_summary}
-            
-            FINANCIAL RATIOS:
-            {ratios_str}
-            
-            TECHNICAL INDICATORS (Most Recent):
-            {tech_str}
-            
-            NEWS ANALYSIS:
-            {news_analysis}
+            response = await self.client.chat.completions.create(
+                model=self.default_model,  # Use appropriate model based on your OpenAI subscription
+                messages=[
+                    {"role": "system", "content": REPORT_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                max_tokens=self.report_max_tokens
+            )
             
-            Based on all this information, provide a comprehensive investment analysis with the following sections:
+            report = response.choices[0].message.content
+            # A report cut off at max_tokens is returned but not cached
+            if response.choices[0].finish_reason != "length":
+                self._cache_set(cache_key, report, REPORT_CACHE_TTL)
+            return report
+        except Exception as e:
+            return f"Error generating comprehensive report: {e}"
+    
+    async def stream_comprehensive_report(self, stock_symbol, stock_info, financial_ratios,
+                                          tech_indicators, news_analysis, price_trends=None):
+        """
+        Stream a comprehensive stock analysis report from OpenAI as it is generated.
+        
+        Tokens are coalesced into chunks whose size starts at one token, so the
+        first bytes go out immediately, and grows up to STREAM_MAX_BATCH_SIZE
+        tokens to keep the number of messages low.
+        
+        Args:
+            stock_symbol (str): Stock symbol
+            stock_info (dict): Stock information dictionary
+            financial_ratios (dict): Financial ratios dictionary
+            tech_indicators (dict): Technical indicators dictionary
+            news_analysis (str): News analysis text
+            price_trends (str, optional): Price trends text
             
-            1. Executive Summary - A brief overview of the company and its current situation
-            2. Fundamental Analysis - Analysis of financial health, valuation, and growth prospects
-            3. Technical Analysis - Interpretation of price movements and technical indicators
-            4. News Impact Analysis - How recent news affects the company's prospects
-            5. Risk Assessment - Key risks facing the company
-            6. Investment Outlook - Overall assessment including strengths, weaknesses, opportunities, and threats
-            7. Recommendation - Clear investment recommendation (Buy/Hold/Sell) with reasoning
+        Yields:
+            str: Consecutive chunks of the comprehensive analysis report
+        """
+        if self.client is None:
+            yield "OpenAI client not initialized. Please set up your API key."
+            return
+        
+        try:
+            prompt = self._build_report_prompt(stock_symbol, stock_info, financial_ratios,
+                                               tech_indicators, news_analysis, price_trends)
             
-            The report should be well-structured with clear sections and bullet points where appropriate.
-            Focus on providing actionable insights based on the data provided.
-            """
+            cache_key = self._cache_key(self.default_model, REPORT_SYSTEM_PROMPT + prompt)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                yield cached
+                return
             
-            response = self.client.chat.completions.create(
-                model=self.default_model,  # Use appropriate model based on your OpenAI subscription
+            stream = await self.client.chat.completions.create(
+                model=self.default_model,
                 messages=[
-                    {"role": "system", "content": "You are a senior financial analyst with extensive experience in equity research and investment analysis."},
+                    {"role": "system", "content": REPORT_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.3,
-                max_tokens=2500
+                max_tokens=self.report_max_tokens,
+                stream=True
             )
             
-            return response.choices[0].message.content
+            report_parts = []
+            batch = []
+            batch_size = 1
+            finish_reason = None
+            # Closing the stream when the consumer stops early (e.g. a client
+            # disconnect) releases the connection and stops the generation
+            async with stream:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    finish_reason = chunk.choices[0].finish_reason or finish_reason
+                    if not chunk.choices[0].delta.content:
+                        continue
+                    batch.append(chunk.choices[0].delta.content)
+                    if len(batch) >= batch_size:
+                        text = "".join(batch)
+                        report_parts.append(text)
+                        batch.clear()
+                        batch_size = min(batch_size * STREAM_BATCH_GROWTH_FACTOR, STREAM_MAX_BATCH_SIZE)
+                        yield text
+            
+            if batch:
+                text = "".join(batch)
+                report_parts.append(text)
+                yield text
+            
+            # A report cut off at max_tokens is streamed but not cached
+            if finish_reason != "length":
+                self._cache_set(cache_key, "".join(report_parts), REPORT_CACHE_TTL)
         except Exception as e:
-            return f"Error generating comprehensive report: {e}"
+            yield f"Error generating comprehensive report: {e}"
 
-    def compare_stocks(self, symbols, returns_stats=None, correlation_matrix=None, financial_ratios=None, tech_indicators=None, sector_info=None):
+    async def compare_stocks(self, symbols, returns_stats=None, correlation_matrix=None, financial_ratios=None, tech_indicators=None, sector_info=None):
         """
         Generate a comparative analysis of multiple stocks.
         
@@ -198,10 +574,16 @@ class AIAnalysis:
             today = datetime.now().strftime("%Y-%m-%d")
             
             # Format data for the prompt
-            returns_data = returns_stats.to_string() if returns_stats is not None else "Not provided"
-            correlation_data = correlation_matrix.to_string() if correlation_matrix is not None else "Not provided"
-            financial_data = financial_ratios.to_string() if financial_ratios is not None else "Not provided"
-            tech_data = tech_indicators.to_string() if tech_indicators is not None else "Not provided"
+            returns_data = _to_compact_csv(returns_stats) if returns_stats is not None else "Not provided"
+            financial_data = _to_compact_csv(financial_ratios) if financial_ratios is not None else "Not provided"
+            tech_data = _to_compact_csv(tech_indicators) if tech_indicators is not None else "Not provided"
+            
+            # The correlation matrix is symmetric, so only the upper triangle is sent
+            if correlation_matrix is not None:
+                upper = np.triu(np.ones(correlation_matrix.shape, dtype=bool), k=1)
+                correlation_data = _to_compact_csv(correlation_matrix.where(upper))
+            else:
+                correlation_data = "Not provided"
             
             # Build sector context if available
             sector_context = ""
@@ -242,7 +624,7 @@ class AIAnalysis:
             Focus on actionable insights that would help an investor choose between these stocks.
             """
             
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.default_model,
                 messages=[
                     {"role": "system", "content": "You are a financial analyst specializing in comparative stock analysis and portfolio construction."},
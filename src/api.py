@@ -4,15 +4,43 @@ Stock Analysis API Server
 This module provides FastAPI endpoints to access stock data and analysis.
 """
 
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import date
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 import pandas as pd
 from typing import Dict, Any
 
 from src.data import StockData
 from src.financial_analysis import FinancialAnalysis
 
-app = FastAPI(title="Stock Analysis API")
+# Shared AI analysis client, created once at startup so its connection pool
+# is reused across requests. None if the AI dependencies are unavailable.
+ai_analysis_client = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the shared AI analysis client on startup and close it on shutdown."""
+    global ai_analysis_client
+    try:
+        from src.ai_analysis import AIAnalysis
+        ai_analysis_client = AIAnalysis()
+    except Exception as e:
+        print(f"AI analysis not available: {e}")
+    
+    yield
+    
+    if ai_analysis_client is not None:
+        await ai_analysis_client.aclose()
+    ai_analysis_client = None
+
+app = FastAPI(title="Stock Analysis API", lifespan=lifespan)
+
+# In-flight analyses by "TICKER:date", shared by concurrent identical requests
+_inflight_analyses = {}
 
 # Enable CORS to allow frontend to communicate with backend
 app.add_middleware(
@@ -33,6 +61,29 @@ async def get_stock_analysis(ticker: str):
     """
     Get financial analysis data for a given stock ticker.
     
+    Concurrent requests for the same ticker on the same day share a single
+    in-flight analysis instead of each running the full pipeline.
+    
+    Args:
+        ticker (str): Stock ticker symbol (e.g., 'AAPL')
+        
+    Returns:
+        dict: Stock analysis data including financial ratios and company info
+    """
+    key = f"{ticker.upper()}:{date.today().isoformat()}"
+    task = _inflight_analyses.get(key)
+    if task is None:
+        task = asyncio.create_task(_analyze_stock(ticker))
+        _inflight_analyses[key] = task
+        task.add_done_callback(lambda _: _inflight_analyses.pop(key, None))
+    
+    # Shield the shared task so a client disconnecting doesn't cancel it for the others
+    return await asyncio.shield(task)
+
+async def _analyze_stock(ticker: str):
+    """
+    Run the full analysis pipeline for a stock ticker.
+    
     Args:
         ticker (str): Stock ticker symbol (e.g., 'AAPL')
         
@@ -43,62 +94,76 @@ async def get_stock_analysis(ticker: str):
         # Initialize stock data object
         stock_data = StockData(ticker)
         
-        # Fetch stock data
-        stock_data.fetch_stock_data()
+        # Fetch stock data (blocking I/O, run off the event loop)
+        await asyncio.to_thread(stock_data.fetch_stock_data)
+
+        # Get basic company info (fetches the info itself if the download failed)
+        company_info = await asyncio.to_thread(stock_data.get_company_info)
 
-        # Fetch financial statements
-        stock_data.fetch_financial_statements()
-        
-        # Get basic company info
-        company_info = stock_data.get_company_info()
-        
         # Get financial analysis
         financial_analysis = FinancialAnalysis(stock_data)
         financial_ratios = financial_analysis.calculate_financial_ratios()
-        
-        # Convert financial ratios to a more JSON-friendly format
-        formatted_ratios = {}
-        for key, value in financial_ratios.items():
-            if isinstance(value, (int, float, str)):
-                formatted_ratios[key] = value
-            else:
-                formatted_ratios[key] = str(value)
-                
-        # Get financial highlights
-        financial_highlights = financial_analysis.get_financial_highlights()
-
-        # Get historical price and volume data (2 years)
-        price_volume_data = []
-        if hasattr(stock_data, 'hist_data_2y') and stock_data.hist_data_2y is not None:
-            df = stock_data.hist_data_2y.reset_index()
-            for row in df.itertuples(index=False):
-                price_volume_data.append({
-                    'date': str(row.Date) if hasattr(row, 'Date') else str(row[0]),
-                    'close': float(row.Close),
-                    'volume': int(row.Volume)
-                })
-
-        # Optionally, add AI/News analysis and comprehensive report if available
-        news_analysis = None
-        comprehensive_report = None
+
+        # Optionally, start the AI/News analysis and comprehensive report right away
+        # (a single LLM call) so the round trip overlaps with the remaining data
+        # fetching and processing below
+        ai = ai_analysis_client
+        ai_task = None
         try:
-            from src.ai_analysis import AIAnalysis
-            from src.reporting import ReportGenerator
-            ai = AIAnalysis()
             company_name = company_info['company_name']
-            price_trends = stock_data.calculate_price_trends()
-            news_analysis = ai.get_news_analysis(company_name, ticker, price_trends)
-            comprehensive_report = ai.generate_comprehensive_report(
-                ticker,
-                stock_data.info,
-                financial_ratios,
-                None,  # recent_indicators, can be added if needed
-                news_analysis,
-                price_trends=price_trends
-            )
+            price_trends = await asyncio.to_thread(stock_data.calculate_price_trends)
+            if ai is not None:
+                ai_task = asyncio.create_task(
+                    ai.news_and_report(
+                        company_name,
+                        ticker,
+                        stock_data.info,
+                        financial_ratios,
+                        None,  # recent_indicators, can be added if needed
+                        price_trends=price_trends
+                    )
+                )
         except Exception:
             pass
 
+        try:
+            # Fetch financial statements (blocking I/O, run off the event loop)
+            await asyncio.to_thread(stock_data.fetch_financial_statements)
+            
+            # Convert financial ratios to a more JSON-friendly format
+            formatted_ratios = {}
+            for key, value in financial_ratios.items():
+                if isinstance(value, (int, float, str)):
+                    formatted_ratios[key] = value
+                else:
+                    formatted_ratios[key] = str(value)
+                    
+            # Get financial highlights
+            financial_highlights = financial_analysis.get_financial_highlights()
+
+            # Get historical price and volume data (2 years)
+            price_volume_data = []
+            if hasattr(stock_data, 'hist_data_2y') and stock_data.hist_data_2y is not None:
+                df = stock_data.hist_data_2y
+                price_volume_data = pd.DataFrame({
+                    'date': df.index.strftime('%Y-%m-%d %H:%M:%S'),
+                    'close': df['Close'].to_numpy(dtype='float64'),
+                    'volume': df['Volume'].to_numpy(dtype='int64')
+                }).to_dict(orient='records')
+
+            # Wait for the news analysis and comprehensive report
+            news_analysis = None
+            comprehensive_report = None
+            if ai_task is not None:
+                try:
+                    news_analysis, comprehensive_report = await ai_task
+                except Exception:
+                    pass
+        finally:
+            # Don't leave the (billed) LLM call running if the pipeline failed
+            if ai_task is not None and not ai_task.done():
+                ai_task.cancel()
+
         # Return combined data
         result = {
             "company_info": company_info,
@@ -114,6 +179,111 @@ async def get_stock_analysis(ticker: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing {ticker}: {str(e)}")
 
+def _sse(data, event=None):
+    """
+    Format a single server-sent event.
+    
+    Args:
+        data (str): Event payload, JSON-encoded so newlines survive
+        event (str, optional): Event name; unnamed events arrive as "message"
+        
+    Returns:
+        str: The SSE message
+    """
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+async def _sse_events(chunks):
+    """
+    Wrap text chunks as server-sent events.
+    
+    Args:
+        chunks (AsyncIterator[str]): Text chunks
+        
+    Yields:
+        str: One SSE message per chunk
+    """
+    async for chunk in chunks:
+        yield _sse(chunk)
+
+def _load_report_inputs(ticker: str):
+    """
+    Fetch the stock data and derived metrics the streamed report is based on.
+    
+    Args:
+        ticker (str): Stock ticker symbol (e.g., 'AAPL')
+        
+    Returns:
+        tuple: (stock_data, company_info, financial_ratios, price_trends)
+    """
+    stock_data = StockData(ticker)
+    stock_data.fetch_stock_data()
+    company_info = stock_data.get_company_info()
+    financial_ratios = FinancialAnalysis(stock_data).calculate_financial_ratios()
+    price_trends = stock_data.calculate_price_trends()
+    return stock_data, company_info, financial_ratios, price_trends
+
+async def _report_events(ai, ticker, stock_data, company_info, financial_ratios, price_trends):
+    """
+    Produce the report stream: a status event, the news section, then the report.
+    
+    Args:
+        ai (AIAnalysis): Shared AI analysis client
+        ticker (str): Stock ticker symbol
+        stock_data (StockData): Fetched stock data
+        company_info (dict): Basic company info
+        financial_ratios (dict): Financial ratios
+        price_trends (str): Price trends text
+        
+    Yields:
+        str: SSE messages
+    """
+    # Send something right away so the client isn't left waiting on the web search
+    yield _sse("Searching recent news", event="status")
+    
+    news_analysis = await ai.get_news_analysis(company_info['company_name'], ticker, price_trends)
+    yield _sse(news_analysis, event="news")
+    
+    report_chunks = ai.stream_comprehensive_report(
+        ticker,
+        stock_data.info,
+        financial_ratios,
+        None,  # recent_indicators, can be added if needed
+        news_analysis,
+        price_trends=price_trends
+    )
+    async for message in _sse_events(report_chunks):
+        yield message
+
+@app.get("/api/stock/{ticker}/report")
+async def stream_stock_report(ticker: str):
+    """
+    Stream the AI comprehensive report for a given stock ticker.
+    
+    The stream opens with a "status" event, then a "news" event holding the
+    news analysis, followed by the report text as unnamed events.
+    
+    Args:
+        ticker (str): Stock ticker symbol (e.g., 'AAPL')
+        
+    Returns:
+        StreamingResponse: Report text as server-sent events
+    """
+    ai = ai_analysis_client
+    if ai is None:
+        raise HTTPException(status_code=503, detail="AI analysis is not available")
+    
+    try:
+        # Blocking data fetching, run off the event loop
+        stock_data, company_info, financial_ratios, price_trends = await asyncio.to_thread(
+            _load_report_inputs, ticker
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error analyzing {ticker}: {str(e)}")
+    
+    events = _report_events(ai, ticker, stock_data, company_info, financial_ratios, price_trends)
+    return StreamingResponse(events, media_type="text/event-stream")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -4,15 +4,83 @@ Stock Data Retrieval Module
 This module provides functions to fetch and organize stock market data.
 """
 
-import yfinance as yf
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
 
+# Ticker objects and company info are shared across StockData instances for
+# this many seconds before being fetched again
+TICKER_CACHE_TTL = 15 * 60
+
+# Look-back periods of calculate_price_trends
+_TREND_LABELS = ('3m', '6m', '12m')
+_TREND_OFFSETS = np.array([90, 180, 365], dtype='timedelta64[D]')
+
+
+def _ttl_bucket():
+    """Return the current TICKER_CACHE_TTL time window, used to expire cache entries."""
+    return int(time.time() // TICKER_CACHE_TTL)
+
+
+@lru_cache(maxsize=512)
+def _cached_ticker(symbol, ttl_bucket):
+    # Imported on first use; yfinance is slow to import and not needed until a fetch
+    import yfinance as yf
+    
+    # No session is passed: recent yfinance versions require their own curl_cffi
+    # session, which they already share (and pool connections on) across Tickers
+    return yf.Ticker(symbol)
+
+
+@lru_cache(maxsize=512)
+def _cached_info(symbol, ttl_bucket):
+    return _cached_ticker(symbol, ttl_bucket).info
+
+
+def _get_ticker(symbol):
+    """
+    Get a yfinance Ticker, shared with other StockData instances for the same symbol.
+    
+    Args:
+        symbol (str): Stock ticker symbol
+        
+    Returns:
+        yfinance.Ticker: Ticker object
+    """
+    return _cached_ticker(symbol, _ttl_bucket())
+
+
+def _get_info(symbol):
+    """
+    Get the company info of a symbol, fetched at most once per cache window.
+    
+    Args:
+        symbol (str): Stock ticker symbol
+        
+    Returns:
+        dict: Company info from Yahoo Finance
+    """
+    return _cached_info(symbol, _ttl_bucket())
+
+
 class StockData:
     """Class for fetching and organizing stock data."""
 
+    # Financial statement attributes and the yfinance Ticker properties they are read from
+    STATEMENT_PROPERTIES = {
+        'balance_sheet_annual': 'balance_sheet',
+        'balance_sheet_quarterly': 'quarterly_balance_sheet',
+        'income_stmt_annual': 'income_stmt',
+        'income_stmt_quarterly': 'quarterly_income_stmt',
+        'cash_flow_annual': 'cashflow',
+        'cash_flow_quarterly': 'quarterly_cashflow',
+    }
+
     def __init__(self, symbol):
         """
         Initialize with a stock symbol.
@@ -32,6 +100,14 @@ class StockData:
         self.cash_flow_quarterly = None
         self.info = None
         
+        # Positions of the highest and lowest close, and the history they were found in
+        self._close_extremes = None
+        self._close_extremes_source = None
+        
+        # Moving averages of the close by windows, and the history they were computed from
+        self._moving_averages = {}
+        self._moving_averages_source = None
+        
     def fetch_stock_data(self, years=0.2):
         """
         Fetch historical stock data for the specified number of years.
@@ -46,28 +122,28 @@ class StockData:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=years*365)
             
-            self.stock = yf.Ticker(self.symbol)
-            
-            # Fetch the data
-            self.hist_data_2y = self.stock.history(
-                start=start_date, 
-                end=end_date, 
-                auto_adjust=True
-            )
+            self.stock = _get_ticker(self.symbol)
             
-            # Convert timezone-aware datetimes to timezone-naive
-            self.hist_data_2y.index = self.hist_data_2y.index.tz_localize(None)
+            # Fetch the price history and the company info concurrently
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                history_future = executor.submit(
+                    self.stock.history,
+                    start=start_date, 
+                    end=end_date, 
+                    auto_adjust=True
+                )
+                info_future = executor.submit(_get_info, self.symbol)
+                self.hist_data_2y = history_future.result()
+                info = info_future.result()
             
             if self.hist_data_2y.empty:
                 print(f"No data found for symbol {self.symbol}")
                 return False
-                
-            # Set 1-year data as a subset of 2-year data
-            start_date_1y = end_date - timedelta(days=365)
-            self.hist_data_1y = self.hist_data_2y[self.hist_data_2y.index >= start_date_1y]
+            
+            self._set_history(self.hist_data_2y, end_date)
             
             # Get company info
-            self.info = self.stock.info
+            self.info = info
             
             return True
             
@@ -75,6 +151,91 @@ class StockData:
             print(f"Error fetching stock data: {e}")
             return False
             
+    @classmethod
+    def fetch_many(cls, symbols, years=0.2):
+        """
+        Fetch historical stock data for several symbols with a single download.
+        
+        The price histories come from one bulk yfinance request, while the company
+        info of each symbol is fetched concurrently.
+        
+        Args:
+            symbols (list): Stock ticker symbols (e.g., ['AAPL', 'MSFT'])
+            years (int): Number of years of historical data to fetch
+            
+        Returns:
+            dict: StockData instances by symbol, for the symbols that have data
+        """
+        import yfinance as yf
+        
+        symbols = list(symbols)
+        stocks = {}
+        if not symbols:
+            return stocks
+        
+        try:
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=years*365)
+            
+            with ThreadPoolExecutor(max_workers=min(len(symbols), 8)) as executor:
+                info_futures = {symbol: executor.submit(_get_info, symbol) for symbol in symbols}
+                panel = yf.download(
+                    symbols,
+                    start=start_date,
+                    end=end_date,
+                    group_by='ticker',
+                    auto_adjust=True,
+                    threads=True,
+                    progress=False
+                )
+                
+                for symbol in symbols:
+                    if isinstance(panel.columns, pd.MultiIndex):
+                        if symbol not in panel.columns.get_level_values(0):
+                            print(f"No data found for symbol {symbol}")
+                            continue
+                        hist_data = panel[symbol].dropna(how='all')
+                    else:
+                        hist_data = panel.dropna(how='all')
+                    
+                    if hist_data.empty:
+                        print(f"No data found for symbol {symbol}")
+                        continue
+                    
+                    try:
+                        info = info_futures[symbol].result()
+                    except Exception as e:
+                        print(f"Error fetching stock info for {symbol}: {e}")
+                        continue
+                    
+                    stock_data = cls(symbol)
+                    stock_data.stock = _get_ticker(symbol)
+                    stock_data._set_history(hist_data, end_date)
+                    stock_data.info = info
+                    stocks[symbol] = stock_data
+        
+        except Exception as e:
+            print(f"Error fetching stock data: {e}")
+        
+        return stocks
+    
+    def _set_history(self, hist_data, end_date):
+        """
+        Store downloaded price history as the 2-year data and its 1-year subset.
+        
+        Args:
+            hist_data (pandas.DataFrame): Price history from yfinance
+            end_date (datetime): End date of the download
+        """
+        # Convert timezone-aware datetimes to timezone-naive
+        hist_data.index = hist_data.index.tz_localize(None)
+        
+        self.hist_data_2y = hist_data
+            
+        # Set 1-year data as a subset of 2-year data
+        start_date_1y = end_date - timedelta(days=365)
+        self.hist_data_1y = self.hist_data_2y.loc[start_date_1y:]
+            
     def fetch_financial_statements(self):
         """
         Fetch financial statements from Yahoo Finance.
@@ -84,19 +245,16 @@ class StockData:
         """
         try:
             if self.stock is None:
-                self.stock = yf.Ticker(self.symbol)
-            
-            # Balance Sheet
-            self.balance_sheet_annual = self.stock.balance_sheet
-            self.balance_sheet_quarterly = self.stock.quarterly_balance_sheet
-            
-            # Income Statement
-            self.income_stmt_annual = self.stock.income_stmt
-            self.income_stmt_quarterly = self.stock.quarterly_income_stmt
+                self.stock = _get_ticker(self.symbol)
             
-            # Cash Flow
-            self.cash_flow_annual = self.stock.cashflow
-            self.cash_flow_quarterly = self.stock.quarterly_cashflow
+            # Each statement is a separate Yahoo request, so fetch them concurrently
+            with ThreadPoolExecutor(max_workers=len(self.STATEMENT_PROPERTIES)) as executor:
+                futures = {
+                    attr: executor.submit(getattr, self.stock, prop)
+                    for attr, prop in self.STATEMENT_PROPERTIES.items()
+                }
+                for attr, future in futures.items():
+                    setattr(self, attr, future.result())
             
             return True
             
@@ -113,8 +271,8 @@ class StockData:
         """
         if self.info is None:
             if self.stock is None:
-                self.stock = yf.Ticker(self.symbol)
-            self.info = self.stock.info
+                self.stock = _get_ticker(self.symbol)
+            self.info = _get_info(self.symbol)
             
         company_name = self.info.get('longName', self.symbol)
         sector = self.info.get('sector', 'N/A')
@@ -127,6 +285,42 @@ class StockData:
             'current_price': self.info.get('currentPrice', 'N/A')
         }
     
+    def get_moving_averages(self, windows=(50, 200)):
+        """
+        Get simple moving averages of the 2-year closing prices.
+        
+        The averages are computed once per downloaded history and window set.
+        
+        Args:
+            windows (iterable): Moving average windows in days
+            
+        Returns:
+            list: numpy.ndarray of each moving average, in the order of `windows`
+        """
+        if self.hist_data_2y is None:
+            print("Historical data not available. Call fetch_stock_data() first.")
+            return None
+        
+        if self._moving_averages_source is not self.hist_data_2y:
+            self._moving_averages = {}
+            self._moving_averages_source = self.hist_data_2y
+        
+        windows = tuple(windows)
+        if windows not in self._moving_averages:
+            # Imported on first use; loading numba is slow and only needed here
+            from src._ta_kernels import dual_moving_average
+            
+            close = self.hist_data_2y['Close'].to_numpy(dtype=np.float64)
+            averages = []
+            # Two windows per pass over the prices
+            for i in range(0, len(windows), 2):
+                pair = windows[i:i + 2]
+                short_ma, long_ma = dual_moving_average(close, pair[0], pair[-1])
+                averages.extend((short_ma, long_ma)[:len(pair)])
+            self._moving_averages[windows] = averages
+        
+        return list(self._moving_averages[windows])
+    
     def calculate_price_trends(self):
         """
         Calculate price trends over different time periods.
@@ -138,33 +332,31 @@ class StockData:
             print("Historical data not available. Call fetch_stock_data() first.")
             return None
             
-        as_of_date = self.hist_data_1y.index[-1]
-        trends = {}
-        periods = {
-            '3m': 90,
-            '6m': 180,
-            '12m': 365
-        }
+        index = self.hist_data_1y.index
+        closes = self.hist_data_1y['Close'].to_numpy()
         
-        for label, days in periods.items():
-            past_date = as_of_date - pd.Timedelta(days=days)
-            # Find the closest available date in the index
-            past_idx = self.hist_data_1y.index.searchsorted(past_date)
-            if past_idx >= len(self.hist_data_1y):
-                trends[label] = None
-                continue
-            past_price = self.hist_data_1y.iloc[past_idx]['Close']
-            current_price = self.hist_data_1y.loc[as_of_date]['Close']
-            if pd.isna(past_price) or pd.isna(current_price):
-                trends[label] = None
-            else:
-                trends[label] = f"{100 * (current_price - past_price) / past_price:.2f}%"
-
-        # All-time high and low
-        all_time_high = self.hist_data_2y['Close'].max()
-        all_time_high_date = self.hist_data_2y['Close'].idxmax()
-        all_time_low = self.hist_data_2y['Close'].min()
-        all_time_low_date = self.hist_data_2y['Close'].idxmin()
+        # Find the closest available date in the index for all periods at once
+        past_dates = index[-1] - _TREND_OFFSETS
+        past_idx = index.searchsorted(past_dates)
+        valid = past_idx < len(closes)
+        past_prices = np.full(len(past_idx), np.nan)
+        past_prices[valid] = closes[past_idx[valid]]
+        changes = 100 * (closes[-1] - past_prices) / past_prices
+        trends = {
+            label: None if np.isnan(change) else f"{change:.2f}%"
+            for label, change in zip(_TREND_LABELS, changes)
+        }
+
+        # All-time high and low, located once per downloaded history
+        closes_2y = self.hist_data_2y['Close'].to_numpy()
+        if self._close_extremes_source is not self.hist_data_2y:
+            self._close_extremes = (np.nanargmax(closes_2y), np.nanargmin(closes_2y))
+            self._close_extremes_source = self.hist_data_2y
+        high_idx, low_idx = self._close_extremes
+        all_time_high = closes_2y[high_idx]
+        all_time_high_date = self.hist_data_2y.index[high_idx]
+        all_time_low = closes_2y[low_idx]
+        all_time_low_date = self.hist_data_2y.index[low_idx]
         
         # Format output string
         output = []
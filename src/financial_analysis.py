@@ -9,9 +9,55 @@ import numpy as np
 from src.data import StockData
 
 
+# Display format of each ratio; ratios not listed use DEFAULT_RATIO_FORMAT
+DEFAULT_RATIO_FORMAT = '.2f'
+RATIO_FORMATS = {
+    'Dividend Yield': '.2%',
+    'Gross Margin': '.2%',
+    'Operating Margin': '.2%',
+    'Net Profit Margin': '.2%',
+    'ROE': '.2%',
+    'ROA': '.2%',
+    'Payout Ratio': '.2%',
+    'Revenue Growth (YoY)': '.2%',
+    'Earnings Growth (YoY)': '.2%',
+    'PEG Ratio': '.2f',
+}
+
+
 class FinancialAnalysis:
     """Class for financial ratio calculation and analysis."""
 
+    # Financial ratios, in display order, and the stock info keys they are read from.
+    # The PEG ratio has no info key and is calculated from the P/E and earnings growth.
+    RATIO_KEYS = (
+        # Valuation Ratios
+        ('P/E Ratio', 'trailingPE'),
+        ('Forward P/E', 'forwardPE'),
+        ('P/B Ratio', 'priceToBook'),
+        ('P/S Ratio', 'priceToSalesTrailing12Months'),
+        ('EV/EBITDA', 'enterpriseToEbitda'),
+        ('PEG Ratio', None),
+        # Profitability Ratios
+        ('Gross Margin', 'grossMargins'),
+        ('Operating Margin', 'operatingMargins'),
+        ('Net Profit Margin', 'profitMargins'),
+        ('ROE', 'returnOnEquity'),
+        ('ROA', 'returnOnAssets'),
+        # Liquidity Ratios
+        ('Current Ratio', 'currentRatio'),
+        ('Quick Ratio', 'quickRatio'),
+        # Debt Ratios
+        ('Debt-to-Equity', 'debtToEquity'),
+        ('Interest Coverage', 'interestCoverage'),
+        # Dividend Ratios
+        ('Dividend Yield', 'dividendYield'),
+        ('Payout Ratio', 'payoutRatio'),
+        # Growth Rates
+        ('Revenue Growth (YoY)', 'revenueGrowth'),
+        ('Earnings Growth (YoY)', 'earningsGrowth'),
+    )
+
     def __init__(self, stock_data: StockData):
         """
         Initialize with stock data.
@@ -20,11 +66,17 @@ class FinancialAnalysis:
             stock_data (StockData): Instance of StockData class
         """
         self.stock_data = stock_data
+        
+        # Ratios of the last stock info they were calculated from
+        self._ratios = None
+        self._ratios_info = None
     
     def calculate_financial_ratios(self):
         """
         Calculate important financial ratios for fundamental analysis.
         
+        The ratios are cached until the stock info is fetched again.
+        
         Returns:
             dict: Dictionary of financial ratios
         """
@@ -33,47 +85,20 @@ class FinancialAnalysis:
             return {}
         
         info = self.stock_data.info
-        ratios = {}
+        if self._ratios_info is info:
+            return dict(self._ratios)
         
-        # Valuation Ratios
-        ratios['P/E Ratio'] = info.get('trailingPE', 'N/A')
-        ratios['Forward P/E'] = info.get('forwardPE', 'N/A')
-        ratios['P/B Ratio'] = info.get('priceToBook', 'N/A')
-        ratios['P/S Ratio'] = info.get('priceToSalesTrailing12Months', 'N/A')
-        ratios['EV/EBITDA'] = info.get('enterpriseToEbitda', 'N/A')
+        ratios = {ratio: info.get(key, 'N/A') for ratio, key in self.RATIO_KEYS}
         
-        # PEG Ratio (Price/Earnings to Growth)
+        # PEG Ratio (Price/Earnings to Growth), filled in at its place in RATIO_KEYS
         pe = info.get('trailingPE', None)
         earnings_growth = info.get('earningsGrowth', None)
         if isinstance(pe, (int, float)) and isinstance(earnings_growth, (int, float)) and earnings_growth != 0:
             ratios['PEG Ratio'] = pe / (earnings_growth * 100)
-        else:
-            ratios['PEG Ratio'] = 'N/A'
-        
-        # Profitability Ratios
-        ratios['Gross Margin'] = info.get('grossMargins', 'N/A')
-        ratios['Operating Margin'] = info.get('operatingMargins', 'N/A')
-        ratios['Net Profit Margin'] = info.get('profitMargins', 'N/A')
-        ratios['ROE'] = info.get('returnOnEquity', 'N/A')
-        ratios['ROA'] = info.get('returnOnAssets', 'N/A')
-        
-        # Liquidity Ratios
-        ratios['Current Ratio'] = info.get('currentRatio', 'N/A')
-        ratios['Quick Ratio'] = info.get('quickRatio', 'N/A')
-        
-        # Debt Ratios
-        ratios['Debt-to-Equity'] = info.get('debtToEquity', 'N/A')
-        ratios['Interest Coverage'] = info.get('interestCoverage', 'N/A')
-        
-        # Dividend Ratios
-        ratios['Dividend Yield'] = info.get('dividendYield', 'N/A')
-        ratios['Payout Ratio'] = info.get('payoutRatio', 'N/A')
-        
-        # Growth Rates
-        ratios['Revenue Growth (YoY)'] = info.get('revenueGrowth', 'N/A')
-        ratios['Earnings Growth (YoY)'] = info.get('earningsGrowth', 'N/A')
         
-        return ratios
+        self._ratios = ratios
+        self._ratios_info = info
+        return dict(ratios)
 
     def format_financial_ratios(self, ratios):
         """
@@ -87,29 +112,12 @@ class FinancialAnalysis:
         """
         ratios_df = pd.DataFrame(list(ratios.items()), columns=['Ratio', 'Value'])
         
-        # Convert numeric values
-        ratios_df['Value'] = pd.to_numeric(ratios_df['Value'], errors='ignore')
-        
-        # Format values for display
-        formatted_values = []
-        for idx, row in ratios_df.iterrows():
-            if row['Ratio'] in ['Dividend Yield', 'Gross Margin', 'Operating Margin', 
-                              'Net Profit Margin', 'ROE', 'ROA', 'Payout Ratio',
-                              'Revenue Growth (YoY)', 'Earnings Growth (YoY)']:
-                if isinstance(row['Value'], (int, float)):
-                    formatted_values.append(f"{row['Value']:.2%}")
-                else:
-                    formatted_values.append(row['Value'])
-            elif row['Ratio'] == 'PEG Ratio':
-                if isinstance(row['Value'], (int, float)):
-                    formatted_values.append(f"{row['Value']:.2f}")
-                else:
-                    formatted_values.append(row['Value'])
-            else:
-                if isinstance(row['Value'], (int, float)):
-                    formatted_values.append(f"{row['Value']:.2f}")
-                else:
-                    formatted_values.append(row['Value'])
+        # Format numeric values for display; anything else (e.g. 'N/A') is shown as is
+        specs = ratios_df['Ratio'].map(RATIO_FORMATS).fillna(DEFAULT_RATIO_FORMAT).to_numpy()
+        formatted_values = [
+            format(value, spec) if isinstance(value, (int, float)) else value
+            for value, spec in zip(ratios_df['Value'].to_numpy(dtype=object), specs)
+        ]
                     
         ratios_df['Formatted Value'] = formatted_values
         return ratios_df[['Ratio', 'Formatted Value']]
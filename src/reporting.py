@@ -5,9 +5,54 @@ This module provides functions for generating and exporting stock analysis repor
 """
 
 import os
-import markdown2
+import re
 import tempfile
-from IPython.display import Markdown, display
+
+
+# Classifies a stripped markdown line for the PDF export
+LINE_RE = re.compile(
+    r'^(?:(?P<h1># )|(?P<h2>## )|(?P<h3>### )|(?P<li>[-*] )|(?P<hr>---)|(?P<blank>$))'
+)
+# Splits a line into alternating regular and bold parts
+BOLD_RE = re.compile(r'\*\*(.+?)\*\*')
+
+# Page layout of the HTML-rendered PDF, mirroring the fonts of the FPDF export
+REPORT_CSS = """
+@page {
+    margin: 20mm 15mm;
+    @top-center { content: "%(title)s"; font: bold 15pt Arial, sans-serif; }
+    @bottom-center { content: "Page " counter(page); font: italic 8pt Arial, sans-serif; }
+}
+body { font: 12pt/1.4 Arial, sans-serif; }
+h1 { font-size: 16pt; }
+h2 { font-size: 14pt; }
+h3 { font-size: 13pt; }
+table { border-collapse: collapse; }
+th, td { border: 1px solid #999; padding: 2px 6px; }
+"""
+
+
+def _data_url_fetcher():
+    """
+    Build a WeasyPrint URL fetcher that only resolves data: URLs.
+    
+    Returns:
+        URLFetcher or callable: Fetcher to pass as `url_fetcher` to WeasyPrint
+    """
+    try:
+        # WeasyPrint 68 and later
+        from weasyprint.urls import URLFetcher
+    except ImportError:
+        from weasyprint import default_url_fetcher
+        
+        def fetch(url, *args, **kwargs):
+            if not url.startswith("data:"):
+                raise ValueError(f"Refusing to fetch {url}")
+            return default_url_fetcher(url, *args, **kwargs)
+        
+        return fetch
+    
+    return URLFetcher(allowed_protocols={'data'})
 
 
 class ReportGenerator:
@@ -25,12 +70,18 @@ class ReportGenerator:
         Args:
             markdown_text (str): Markdown formatted text
         """
+        # Imported here so that non-notebook use does not pay for loading IPython
+        from IPython.display import Markdown, display
+        
         display(Markdown(markdown_text))
     
     @staticmethod
     def export_report_to_pdf(report_text, symbol, filename=None):
         """
-        Export the markdown report to a PDF file using FPDF.
+        Export the markdown report to a PDF file.
+        
+        The report is rendered to HTML with markdown2 and converted with WeasyPrint.
+        If WeasyPrint is not installed, the report is laid out with FPDF instead.
         
         Args:
             report_text (str): Markdown formatted report text
@@ -40,11 +91,43 @@ class ReportGenerator:
         Returns:
             str: Path to the generated PDF file or error message
         """
+        if filename is None:
+            filename = f"{symbol}_analysis_report.pdf"
+        
         try:
-            from fpdf import FPDF
+            from weasyprint import CSS, HTML
+        except (ImportError, OSError):
+            # WeasyPrint is missing or its system libraries are not available
+            return ReportGenerator._export_report_with_fpdf(report_text, symbol, filename)
+        
+        try:
+            import markdown2
+            
+            title = f"{symbol} - Stock Analysis Report".replace('\\', '\\\\').replace('"', '\\"')
+            # The report is model output: escape raw HTML and never fetch external resources
+            html = markdown2.markdown(report_text, safe_mode="escape", extras=["fenced-code-blocks", "tables"])
+            HTML(string=html, url_fetcher=_data_url_fetcher()).write_pdf(
+                filename, stylesheets=[CSS(string=REPORT_CSS % {'title': title})]
+            )
+            return f"Report successfully exported to {filename}"
+        except Exception as e:
+            return f"Error in PDF generation: {e}"
+    
+    @staticmethod
+    def _export_report_with_fpdf(report_text, symbol, filename):
+        """
+        Export the markdown report to a PDF file using FPDF.
+        
+        Args:
+            report_text (str): Markdown formatted report text
+            symbol (str): Stock symbol for the header
+            filename (str): Output filename
             
-            if filename is None:
-                filename = f"{symbol}_analysis_report.pdf"
+        Returns:
+            str: Path to the generated PDF file or error message
+        """
+        try:
+            from fpdf import FPDF
             
             class PDF(FPDF):
                 def header(self):
@@ -67,64 +150,89 @@ class ReportGenerator:
             # Process the markdown content
             current_font_size = 12
             in_list = False
+            current_font = None
+            paragraph = []
+            
+            def set_font(style, size):
+                # Only switch fonts on a change. FPDF restores the font after
+                # drawing the header and footer, so the tracked font stays valid.
+                nonlocal current_font
+                if current_font != (style, size):
+                    pdf.set_font('Arial', style, size)
+                    current_font = (style, size)
+            
+            def flush_paragraph():
+                # Write the collected plain lines with a single multi_cell
+                if paragraph:
+                    set_font('', current_font_size)
+                    pdf.multi_cell(0, 7, '\n'.join(paragraph))
+                    paragraph.clear()
+            
+            # Safely encode the report to avoid encoding issues (FPDF only handles latin-1)
+            report_text = report_text.encode('latin-1', 'replace').decode('latin-1')
             
             for line in report_text.split('\n'):
-                # Safely encode the line to avoid encoding issues
-                line = line.encode('latin-1', 'replace').decode('latin-1')
+                stripped = line.strip()
+                match = LINE_RE.match(stripped)
+                kind = match.lastgroup if match else None
+                
+                if kind is None and not (in_list and line[0] in ' \t'):
+                    parts = BOLD_RE.split(line)
+                    if len(parts) == 1:
+                        # Regular text without formatting
+                        in_list = False
+                        paragraph.append(line)
+                        continue
+                
+                flush_paragraph()
                 
                 # Section headers
-                if line.strip().startswith('# '):
-                    pdf.set_font('Arial', 'B', 16)
+                if kind == 'h1':
+                    set_font('B', 16)
                     pdf.cell(0, 10, line.replace('#', '').strip(), ln=True)
                     pdf.ln(5)
                     current_font_size = 12
-                elif line.strip().startswith('## '):
-                    pdf.set_font('Arial', 'B', 14)
+                elif kind == 'h2':
+                    set_font('B', 14)
                     pdf.cell(0, 10, line.replace('##', '').strip(), ln=True)
                     pdf.ln(3)
                     current_font_size = 12
-                elif line.strip().startswith('### '):
-                    pdf.set_font('Arial', 'B', 13)
+                elif kind == 'h3':
+                    set_font('B', 13)
                     pdf.cell(0, 10, line.replace('###', '').strip(), ln=True)
                     current_font_size = 12
-                elif line.strip().startswith('- ') or line.strip().startswith('* '):
+                elif kind == 'li':
                     # List items - using a hyphen instead of bullet point
-                    pdf.set_font('Arial', '', current_font_size)
-                    item_text = line.strip()[2:].strip()
+                    set_font('', current_font_size)
+                    item_text = stripped[2:].strip()
                     pdf.cell(10, 7, '-', 0, 0)  # Use hyphen instead of bullet point
                     pdf.multi_cell(0, 7, item_text)
                     in_list = True
-                elif line.strip().startswith('---'):
+                elif kind == 'hr':
                     pdf.ln(2)
                     pdf.line(pdf.get_x(), pdf.get_y(), pdf.get_x() + 190, pdf.get_y())
                     pdf.ln(5)
-                elif line.strip() == '':
+                elif kind == 'blank':
                     # Empty line
                     pdf.ln(5)
                     in_list = False
+                elif in_list and line[0] in ' \t':
+                    # Continuation of list item with indentation
+                    set_font('', current_font_size)
+                    pdf.set_x(pdf.get_x() + 10)
+                    pdf.multi_cell(0, 7, stripped)
                 else:
-                    # Regular text
-                    if in_list and line.strip() and (line[0] == ' ' or line[0] == '\t'):
-                        # Continuation of list item with indentation
-                        pdf.set_font('Arial', '', current_font_size)
-                        pdf.set_x(pdf.get_x() + 10)
-                        pdf.multi_cell(0, 7, line.strip())
-                    else:
-                        in_list = False
-                        # Handle bold text (very simplified approach)
-                        if '**' in line:
-                            parts = line.split('**')
-                            for i, part in enumerate(parts):
-                                if i % 2 == 0:  # Even parts are regular text
-                                    pdf.set_font('Arial', '', current_font_size)
-                                    pdf.write(7, part)
-                                else:  # Odd parts are bold
-                                    pdf.set_font('Arial', 'B', current_font_size)
-                                    pdf.write(7, part)
-                            pdf.ln()
-                        else:
-                            pdf.set_font('Arial', '', current_font_size)
-                            pdf.multi_cell(0, 7, line)
+                    # Regular text with bold parts (very simplified approach)
+                    in_list = False
+                    for i, part in enumerate(parts):
+                        if i % 2 == 0:  # Even parts are regular text
+                            set_font('', current_font_size)
+                        else:  # Odd parts are bold
+                            set_font('B', current_font_size)
+                        pdf.write(7, part)
+                    pdf.ln()
+            
+            flush_paragraph()
             
             pdf.output(filename)
             return f"Report successfully exported to {filename}"
@@ -6,6 +6,7 @@ This module provides functions for calculating technical indicators for stock an
 
 import pandas as pd
 import numpy as np
+from src._ta_kernels import INDICATOR_COLUMNS, compute_indicators
 
 
 class TechnicalAnalysis:
@@ -40,41 +41,15 @@ class TechnicalAnalysis:
         # Make a copy to avoid modifying the original dataframe
         df = data.copy()
         
-        # Moving Averages
-        df['MA20'] = df['Close'].rolling(window=20).mean()
-        df['MA50'] = df['Close'].rolling(window=50).mean()
-        df['MA200'] = df['Close'].rolling(window=200).mean()
-        
-        # Exponential Moving Averages
-        df['EMA12'] = df['Close'].ewm(span=12, adjust=False).mean()
-        df['EMA26'] = df['Close'].ewm(span=26, adjust=False).mean()
-        
-        # MACD
-        df['MACD'] = df['EMA12'] - df['EMA26']
-        df['MACD_Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
-        df['MACD_Histogram'] = df['MACD'] - df['MACD_Signal']
-        
-        # Relative Strength Index (RSI)
-        delta = df['Close'].diff()
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
-        avg_gain = gain.rolling(window=14).mean()
-        avg_loss = loss.rolling(window=14).mean()
-        rs = avg_gain / avg_loss
-        df['RSI'] = 100 - (100 / (1 + rs))
-        
-        # Bollinger Bands
-        df['BB_Middle'] = df['Close'].rolling(window=20).mean()
-        df['BB_Std'] = df['Close'].rolling(window=20).std()
-        df['BB_Upper'] = df['BB_Middle'] + (df['BB_Std'] * 2)
-        df['BB_Lower'] = df['BB_Middle'] - (df['BB_Std'] * 2)
-        
-        # Average True Range (ATR)
-        df['TR1'] = abs(df['High'] - df['Low'])
-        df['TR2'] = abs(df['High'] - df['Close'].shift())
-        df['TR3'] = abs(df['Low'] - df['Close'].shift())
-        df['TR'] = df[['TR1', 'TR2', 'TR3']].max(axis=1)
-        df['ATR'] = df['TR'].rolling(window=14).mean()
+        # All indicators are computed in one compiled pass over the price arrays
+        indicators = np.empty((len(df), len(INDICATOR_COLUMNS)))
+        compute_indicators(
+            df['Close'].to_numpy(dtype=np.float64),
+            df['High'].to_numpy(dtype=np.float64),
+            df['Low'].to_numpy(dtype=np.float64),
+            indicators
+        )
+        df[list(INDICATOR_COLUMNS)] = indicators
         
         return df
     
@@ -97,12 +72,12 @@ class TechnicalAnalysis:
         if tech_data.empty:
             return {}
         
-        recent_date = tech_data.index[-1]
         indicators = {}
         
+        # Read the last row positionally from the column arrays, as plain Python floats
         for col in ['Close', 'RSI', 'MACD', 'MACD_Signal', 'MACD_Histogram', 
                   'ATR', 'BB_Upper', 'BB_Middle', 'BB_Lower']:
             if col in tech_data.columns:
-                indicators[col] = tech_data.loc[recent_date, col]
+                indicators[col] = float(tech_data[col].to_numpy()[-1])
         
         return indicators
\ No newline at end of file
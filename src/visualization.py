@@ -4,13 +4,209 @@ Visualization Module
 This module provides functions for visualizing stock data and analysis results.
 """
 
+import copy
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from src._ta_kernels import m4_indices
+
+
+# Chart width in pixels; longer series are downsampled to what this width can show
+DOWNSAMPLE_WIDTH = 1200
+
+# Bar colors, indexed by whether a bar closed down (volume) or is non-negative (MACD)
+_VOLUME_PALETTE = np.array(['green', 'red'], dtype=object)
+_MACD_PALETTE = np.array(['red', 'green'], dtype=object)
+
+# Plotly template with the layout shared by all charts, registered on first use
+CHART_TEMPLATE = 'stockviz'
+_CHART_TEMPLATE_LAYOUT = dict(
+    showlegend=True,
+    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+)
+
+# Settings seaborn's set_theme(style="darkgrid") adds on top of the matplotlib
+# darkgrid style: the "deep" palette and the "notebook" context sizes
+_THEME_RC = {
+    'axes.labelsize': 12.0,
+    'axes.titlesize': 12.0,
+    'axes.linewidth': 1.25,
+    'font.size': 12.0,
+    'grid.linewidth': 1.0,
+    'legend.fontsize': 11.0,
+    'legend.title_fontsize': 12.0,
+    'patch.edgecolor': 'w',
+    'patch.force_edgecolor': True,
+    'xtick.bottom': False,
+    'xtick.labelsize': 11.0,
+    'xtick.major.size': 6.0,
+    'xtick.major.width': 1.25,
+    'xtick.minor.size': 4.0,
+    'xtick.minor.width': 1.0,
+    'ytick.left': False,
+    'ytick.labelsize': 11.0,
+    'ytick.major.size': 6.0,
+    'ytick.major.width': 1.25,
+    'ytick.minor.size': 4.0,
+    'ytick.minor.width': 1.0,
+}
+_THEME_COLORS = [
+    '#4C72B0', '#DD8452', '#55A868', '#C44E52', '#8172B3',
+    '#937860', '#DA8BC3', '#8C8C8C', '#CCB974', '#64B5CD',
+]
+
+# Whether the matplotlib style has been applied
+_STYLE_SET = False
+
+# Whether the shared Kaleido renderer for static images has been set up
+_IMAGE_SERVER_STARTED = False
+
+
+def _chart_template():
+    """
+    Register the shared chart template once and return the template to apply to figures.
+    
+    Returns:
+        str: Template name, layered on the current default template (pio.templates.default)
+    """
+    import plotly.io as pio
+    
+    if CHART_TEMPLATE not in pio.templates:
+        pio.templates[CHART_TEMPLATE] = dict(layout=_CHART_TEMPLATE_LAYOUT)
+    
+    # Read on every call so a default changed in the notebook (e.g. plotly_dark) is honoured
+    default = pio.templates.default
+    if not default or default == "none":
+        return CHART_TEMPLATE
+    if CHART_TEMPLATE in default.split("+"):
+        return default
+    return f"{default}+{CHART_TEMPLATE}"
+
+
+def _ensure_style():
+    """Apply the plotting style once per process instead of once per StockVisualization."""
+    global _STYLE_SET
+    if _STYLE_SET:
+        return
+    import matplotlib.pyplot as plt
+    
+    plt.style.use('seaborn-v0_8-darkgrid')
+    plt.rcParams.update(_THEME_RC)
+    plt.rcParams['axes.prop_cycle'] = plt.cycler(color=_THEME_COLORS)
+    _STYLE_SET = True
+
+
+def _ensure_image_server():
+    """
+    Start one Kaleido renderer to be reused by every static image export.
+    
+    Kaleido 1.1+ otherwise launches a new browser for each image, while older
+    versions already keep their renderer process alive between exports.
+    """
+    global _IMAGE_SERVER_STARTED
+    if _IMAGE_SERVER_STARTED:
+        return
+    _IMAGE_SERVER_STARTED = True
+    try:
+        import kaleido
+        if hasattr(kaleido, 'start_sync_server'):
+            kaleido.start_sync_server(silence_warnings=True)
+    except Exception:
+        # Without a shared renderer, to_image still works (or reports why it cannot)
+        pass
+
+
+def _f32(values):
+    """
+    Convert chart values to single precision, which halves their size in the figure JSON.
+    
+    Args:
+        values (array-like): Values to plot
+        
+    Returns:
+        numpy.ndarray: float32 array
+    """
+    return np.asarray(values, dtype=np.float32)
+
+
+def _epoch_ms(index):
+    """
+    Convert a DatetimeIndex to epoch milliseconds, a compact x-axis for date axes.
+    
+    Args:
+        index (pandas.DatetimeIndex): Dates of the data
+        
+    Returns:
+        numpy.ndarray: int64 milliseconds since the epoch
+    """
+    return index.to_numpy(dtype='datetime64[ms]').astype(np.int64)
+
+
+def _m4(x, y, width=DOWNSAMPLE_WIDTH):
+    """
+    Downsample a line trace with M4 when it has more points than the chart can show.
+    
+    Args:
+        x (numpy.ndarray): X values of the line
+        y (array-like): Y values of the line
+        width (int): Chart width in pixels
+        
+    Returns:
+        dict: x and y (float32) of the points to draw, as keyword arguments for the trace
+    """
+    y = np.asarray(y, dtype=np.float64)
+    if len(y) <= 4 * width:
+        return dict(x=x, y=_f32(y))
+    idx = m4_indices(y, width)
+    return dict(x=x[idx], y=_f32(y[idx]))
+
+
+def _ohlc_bins(data, width=DOWNSAMPLE_WIDTH):
+    """
+    Merge consecutive price bars so that no more than one bar falls on each pixel.
+    
+    Args:
+        data (pandas.DataFrame): Price history with Open, High, Low, Close and Volume
+        width (int): Chart width in pixels
+        
+    Returns:
+        pandas.DataFrame: Price history with at most `width` bars
+    """
+    n = len(data)
+    if n <= width:
+        return data
+    starts = np.unique(np.linspace(0, n, width + 1).astype(np.int64)[:-1])
+    ends = np.append(starts[1:], n) - 1
+    return pd.DataFrame({
+        'Open': data['Open'].to_numpy()[starts],
+        'High': np.fmax.reduceat(data['High'].to_numpy(), starts),
+        'Low': np.fmin.reduceat(data['Low'].to_numpy(), starts),
+        'Close': data['Close'].to_numpy()[ends],
+        'Volume': np.add.reduceat(data['Volume'].to_numpy(), starts),
+    }, index=data.index[starts])
+
+
+def _build_charts(stock_data):
+    """
+    Build the price/volume and technical charts of one stock, e.g. in a worker process.
+    
+    Args:
+        stock_data (StockData): Instance of StockData class with fetched price history
+        
+    Returns:
+        tuple: (price/volume chart, technical chart) as figure dicts, None where unavailable
+    """
+    from src.technical_analysis import TechnicalAnalysis
+    
+    viz = StockVisualization(stock_data)
+    tech_data = TechnicalAnalysis(stock_data).calculate_technical_indicators()
+    price_volume_chart = viz.create_price_volume_chart()
+    tech_chart = viz.create_technical_chart(tech_data)
+    return (
+        price_volume_chart.to_dict() if price_volume_chart is not None else None,
+        tech_chart.to_dict() if tech_chart is not None else None
+    )
 
 
 class StockVisualization:
@@ -25,9 +221,52 @@ class StockVisualization:
         """
         self.stock_data = stock_data
         
+        # Built figures by chart and the data they were built from
+        self._figure_cache = {}
+        
         # Configure plotting
-        plt.style.use('seaborn-v0_8-darkgrid')
-        sns.set_theme(style="darkgrid")
+        _ensure_style()
+    
+    @classmethod
+    def build_many(cls, stock_datas, workers=None):
+        """
+        Build the price/volume and technical charts of several stocks in parallel processes.
+        
+        Args:
+            stock_datas (list): StockData instances with fetched price history
+            workers (int, optional): Number of worker processes. If None, uses one per CPU.
+            
+        Returns:
+            list: (price/volume chart, technical chart) figure dicts per stock, in input order.
+                  Pass a dict to plotly.graph_objects.Figure to get a figure back.
+        """
+        # Workers only need the data; the yfinance Ticker stays in this process
+        payloads = []
+        for stock_data in stock_datas:
+            payload = copy.copy(stock_data)
+            payload.stock = None
+            payloads.append(payload)
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_build_charts, payloads))
+    
+    def invalidate_cache(self):
+        """Drop the cached figures, e.g. after the stock data has been fetched again."""
+        self._figure_cache.clear()
+    
+    def _figure_key(self, chart, data):
+        """
+        Key a chart by the symbol, length and last timestamp of the data it shows.
+        
+        Args:
+            chart (str): Name of the chart
+            data (pandas.DataFrame): Data plotted in the chart
+            
+        Returns:
+            tuple: Cache key of the figure
+        """
+        last = data.index[-1] if len(data) else None
+        return (chart, self.stock_data.symbol, len(data), last)
     
     def create_price_volume_chart(self):
         """
@@ -40,6 +279,12 @@ class StockVisualization:
             print("Historical data not available. Fetch stock data first.")
             return None
         
+        key = self._figure_key('price_volume', self.stock_data.hist_data_2y)
+        if key in self._figure_cache:
+            return self._figure_cache[key]
+        
+        from plotly.subplots import make_subplots
+        
         # Create the figure
         fig = make_subplots(
             rows=2, cols=1, 
@@ -49,56 +294,47 @@ class StockVisualization:
             row_heights=[0.7, 0.3]
         )
         
-        # Add price candlestick
-        fig.add_trace(
-            go.Candlestick(
-                x=self.stock_data.hist_data_2y.index,
-                open=self.stock_data.hist_data_2y['Open'],
-                high=self.stock_data.hist_data_2y['High'],
-                low=self.stock_data.hist_data_2y['Low'],
-                close=self.stock_data.hist_data_2y['Close'],
+        bars = _ohlc_bins(self.stock_data.hist_data_2y)
+        bar_idx = _epoch_ms(bars.index)
+        idx = _epoch_ms(self.stock_data.hist_data_2y.index)
+        ma50, ma200 = self.stock_data.get_moving_averages([50, 200])
+        colors = _VOLUME_PALETTE[(bars['Open'].to_numpy() > bars['Close'].to_numpy()).astype(np.uint8)]
+        
+        # All traces are added in one batch, with the subplot row of each
+        traces = [
+            # Price candlestick
+            dict(
+                type='candlestick',
+                x=bar_idx,
+                open=_f32(bars['Open']),
+                high=_f32(bars['High']),
+                low=_f32(bars['Low']),
+                close=_f32(bars['Close']),
                 name="Price"
             ),
-            row=1, col=1
-        )
-        
-        # Add moving averages
-        hist_data_2y = self.stock_data.hist_data_2y.copy()
-        hist_data_2y['MA50'] = hist_data_2y['Close'].rolling(window=50).mean()
-        hist_data_2y['MA200'] = hist_data_2y['Close'].rolling(window=200).mean()
-        
-        fig.add_trace(
-            go.Scatter(
-                x=hist_data_2y.index,
-                y=hist_data_2y['MA50'],
+            # Moving averages
+            dict(
+                type='scatter',
+                **_m4(idx, ma50),
                 name="50-Day MA",
                 line=dict(color='orange', width=1)
             ),
-            row=1, col=1
-        )
-        
-        fig.add_trace(
-            go.Scatter(
-                x=hist_data_2y.index,
-                y=hist_data_2y['MA200'],
+            dict(
+                type='scatter',
+                **_m4(idx, ma200),
                 name="200-Day MA",
                 line=dict(color='purple', width=1)
             ),
-            row=1, col=1
-        )
-        
-        # Volume
-        colors = ['red' if row['Open'] > row['Close'] else 'green' 
-                for i, row in hist_data_2y.iterrows()]
-        fig.add_trace(
-            go.Bar(
-                x=hist_data_2y.index,
-                y=hist_data_2y['Volume'],
+            # Volume
+            dict(
+                type='bar',
+                x=bar_idx,
+                y=bars['Volume'],
                 name="Volume",
                 marker_color=colors
             ),
-            row=2, col=1
-        )
+        ]
+        fig.add_traces(traces, rows=[1, 1, 1, 2], cols=[1] * len(traces))
         
         # Update layout
         fig.update_layout(
@@ -106,10 +342,13 @@ class StockVisualization:
             xaxis_rangeslider_visible=False,
             height=800,
             width=1200,
-            showlegend=True,
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+            template=_chart_template()
         )
         
+        # X values are epoch milliseconds
+        fig.update_xaxes(type='date')
+        
+        self._figure_cache[key] = fig
         return fig
     
     def create_technical_chart(self, tech_data):
@@ -126,6 +365,22 @@ class StockVisualization:
             print("Technical indicator data not available.")
             return None
         
+        key = self._figure_key('technical', tech_data)
+        if key in self._figure_cache:
+            return self._figure_cache[key]
+        
+        idx = _epoch_ms(tech_data.index)
+        close = tech_data['Close'].to_numpy(dtype=np.float64)
+        bb_upper = tech_data['BB_Upper'].to_numpy(dtype=np.float64)
+        bb_middle = tech_data['BB_Middle'].to_numpy(dtype=np.float64)
+        bb_lower = tech_data['BB_Lower'].to_numpy(dtype=np.float64)
+        rsi = tech_data['RSI'].to_numpy(dtype=np.float64)
+        macd = tech_data['MACD'].to_numpy(dtype=np.float64)
+        macd_signal = tech_data['MACD_Signal'].to_numpy(dtype=np.float64)
+        macd_histogram = tech_data['MACD_Histogram'].to_numpy(dtype=np.float64)
+        
+        from plotly.subplots import make_subplots
+        
         # Create the figure
         fig = make_subplots(
             rows=3, cols=1, 
@@ -135,110 +390,80 @@ class StockVisualization:
             row_heights=[0.5, 0.25, 0.25]
         )
         
-        # Price with Bollinger Bands
-        fig.add_trace(
-            go.Scatter(
-                x=tech_data.index,
-                y=tech_data['Close'],
+        histogram = _m4(idx, macd_histogram)
+        colors = _MACD_PALETTE[(histogram['y'] >= 0).astype(np.uint8)]
+        
+        # All traces are added in one batch, with the subplot row of each.
+        # Lines are drawn with WebGL to stay fast on dense series.
+        traces = [
+            # Price with Bollinger Bands
+            dict(
+                type='scattergl',
+                **_m4(idx, close),
                 name="Close Price",
                 line=dict(color='blue')
             ),
-            row=1, col=1
-        )
-        
-        fig.add_trace(
-            go.Scatter(
-                x=tech_data.index,
-                y=tech_data['BB_Upper'],
+            dict(
+                type='scattergl',
+                **_m4(idx, bb_upper),
                 name="BB Upper",
                 line=dict(color='gray', width=1)
             ),
-            row=1, col=1
-        )
-        
-        fig.add_trace(
-            go.Scatter(
-                x=tech_data.index,
-                y=tech_data['BB_Middle'],
+            dict(
+                type='scattergl',
+                **_m4(idx, bb_middle),
                 name="BB Middle",
                 line=dict(color='gray', width=1, dash='dash')
             ),
-            row=1, col=1
-        )
-        
-        fig.add_trace(
-            go.Scatter(
-                x=tech_data.index,
-                y=tech_data['BB_Lower'],
+            dict(
+                type='scattergl',
+                **_m4(idx, bb_lower),
                 name="BB Lower",
                 line=dict(color='gray', width=1)
             ),
-            row=1, col=1
-        )
-        
-        # RSI
-        fig.add_trace(
-            go.Scatter(
-                x=tech_data.index,
-                y=tech_data['RSI'],
+            # RSI
+            dict(
+                type='scattergl',
+                **_m4(idx, rsi),
                 name="RSI",
                 line=dict(color='purple')
             ),
-            row=2, col=1
-        )
-        
-        # Add RSI overbought/oversold lines
-        fig.add_trace(
-            go.Scatter(
-                x=tech_data.index,
-                y=[70] * len(tech_data),
-                name="Overbought",
-                line=dict(color='red', width=1, dash='dash')
-            ),
-            row=2, col=1
-        )
-        
-        fig.add_trace(
-            go.Scatter(
-                x=tech_data.index,
-                y=[30] * len(tech_data),
-                name="Oversold",
-                line=dict(color='green', width=1, dash='dash')
-            ),
-            row=2, col=1
-        )
-        
-        # MACD
-        fig.add_trace(
-            go.Scatter(
-                x=tech_data.index,
-                y=tech_data['MACD'],
+            # MACD
+            dict(
+                type='scattergl',
+                **_m4(idx, macd),
                 name="MACD",
                 line=dict(color='blue')
             ),
-            row=3, col=1
-        )
-        
-        fig.add_trace(
-            go.Scatter(
-                x=tech_data.index,
-                y=tech_data['MACD_Signal'],
+            dict(
+                type='scattergl',
+                **_m4(idx, macd_signal),
                 name="Signal Line",
                 line=dict(color='red')
             ),
-            row=3, col=1
-        )
-        
-        # MACD Histogram
-        colors = ['green' if val >= 0 else 'red' for val in tech_data['MACD_Histogram']]
-        fig.add_trace(
-            go.Bar(
-                x=tech_data.index,
-                y=tech_data['MACD_Histogram'],
+            # MACD Histogram
+            dict(
+                type='bar',
+                **histogram,
                 name="MACD Histogram",
                 marker_color=colors
             ),
-            row=3, col=1
+        ]
+        fig.add_traces(traces, rows=[1, 1, 1, 1, 2, 3, 3, 3], cols=[1] * len(traces))
+        
+        # Add RSI overbought/oversold lines
+        fig.add_hline(
+            y=70,
+            line=dict(color='red', width=1, dash='dash'),
+            annotation_text="Overbought",
+            row=2, col=1
+        )
+        
+        fig.add_hline(
+            y=30,
+            line=dict(color='green', width=1, dash='dash'),
+            annotation_text="Oversold",
+            row=2, col=1
         )
         
         # Update layout
@@ -246,8 +471,7 @@ class StockVisualization:
             title=f"{self.stock_data.symbol} Technical Indicators (1 Year)",
             height=900,
             width=1200,
-            showlegend=True,
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+            template=_chart_template()
         )
         
         # Add y-axis titles
@@ -255,6 +479,10 @@ class StockVisualization:
         fig.update_yaxes(title_text="RSI", row=2, col=1)
         fig.update_yaxes(title_text="MACD", row=3, col=1)
         
+        # X values are epoch milliseconds
+        fig.update_xaxes(type='date')
+        
+        self._figure_cache[key] = fig
         return fig
     
     @staticmethod
@@ -268,8 +496,9 @@ class StockVisualization:
         if not static:
             figure.show()
         else:
-            # Fallback to static display
-            img_bytes = figure.to_image(format="png")
+            # Fallback to static display; WebP encodes charts smaller and faster than PNG
+            _ensure_image_server()
+            img_bytes = figure.to_image(format="webp")
             from IPython.display import Image, display
-            display(Image(img_bytes))
+            display(Image(img_bytes, format='webp'))
         
\ No newline at end of file